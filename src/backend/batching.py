@@ -0,0 +1,93 @@
+import asyncio
+import contextlib
+from collections.abc import Callable
+from concurrent.futures import Executor
+from typing import Any
+
+from starlette.concurrency import run_in_threadpool
+
+
+class MicroBatcher:
+    """
+    Collect items submitted by concurrent requests into small batches.
+
+    A worker task waits for the first item, then gathers more for up to ``max_wait_ms`` or until
+    ``max_batch_size`` items are queued, and runs the blocking ``process_batch`` on ``executor``
+    (the shared threadpool if not given).
+    """
+
+    def __init__(
+        self,
+        process_batch: Callable[[list[Any]], list[Any]],
+        max_batch_size: int = 8,
+        max_wait_ms: float = 20,
+        executor: Executor | None = None,
+    ):
+        self.process_batch = process_batch
+        self.executor = executor
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000
+        self._queue: asyncio.Queue | None = None
+        self._worker: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """Start the worker task on the running event loop."""
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Cancel the worker task."""
+        if self._worker is not None:
+            self._worker.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._worker
+        self._worker = None
+        self._queue = None
+
+    async def submit(self, item: Any) -> Any:
+        """Queue an item and wait for its result."""
+        loop = asyncio.get_running_loop()
+        # (Re)start lazily, the app may run on a different loop than the one the worker was created on
+        if self._worker is None or self._worker.done() or self._worker.get_loop() is not loop:
+            self.start()
+        future = loop.create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def _collect(self) -> list[tuple[Any, asyncio.Future]]:
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except TimeoutError:
+                break
+        # Drop requests whose client went away while waiting
+        return [(item, future) for item, future in batch if not future.done()]
+
+    async def _process(self, items: list[Any]) -> list[Any]:
+        if self.executor is None:
+            return await run_in_threadpool(self.process_batch, items)
+        return await asyncio.get_running_loop().run_in_executor(self.executor, self.process_batch, items)
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect()
+            if not batch:
+                continue
+            try:
+                results = await self._process([item for item, _ in batch])
+                # Checked here, a length mismatch must fail the callers, not the worker task
+                paired = list(zip(batch, results, strict=True))
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future), result in paired:
+                if not future.done():
+                    future.set_result(result)
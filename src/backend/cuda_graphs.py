@@ -0,0 +1,62 @@
+import threading
+
+import torch
+from transformers.modeling_outputs import BaseModelOutput
+
+WARMUP_ITERS = 3
+
+
+class CUDAGraphEncoder:
+    """
+    Replay the Whisper encoder forward from CUDA graphs instead of launching its kernels one by one.
+
+    The encoder always sees 30 s of mel frames, so its input shape only varies with the batch size and one graph
+    captured per (shape, dtype) covers every call. Graphs are captured lazily on first use of each batch size.
+    Calls that are not plain CUDA inference (CPU tensors, autograd, attentions or hidden states requested) run eagerly.
+    """
+
+    def __init__(self, forward):
+        self.forward = forward
+        self._graphs: dict[tuple, tuple[torch.cuda.CUDAGraph, torch.Tensor, torch.Tensor]] = {}
+        self._lock = threading.Lock()
+
+    def _capture(self, input_features: torch.Tensor) -> tuple[torch.cuda.CUDAGraph, torch.Tensor, torch.Tensor]:
+        static_input = input_features.clone()
+        # Warm up on a side stream so lazy initialisation does not end up in the graph
+        stream = torch.cuda.Stream()
+        stream.wait_stream(torch.cuda.current_stream())
+        with torch.cuda.stream(stream):
+            for _ in range(WARMUP_ITERS):
+                self.forward(static_input)
+        torch.cuda.current_stream().wait_stream(stream)
+
+        graph = torch.cuda.CUDAGraph()
+        with torch.cuda.graph(graph):
+            static_output = self.forward(static_input).last_hidden_state
+        return graph, static_input, static_output
+
+    def __call__(self, input_features: torch.Tensor, *args, **kwargs):
+        eager = (
+            args
+            or not input_features.is_cuda
+            or torch.is_grad_enabled()
+            or kwargs.get("head_mask") is not None
+            or kwargs.get("output_attentions")
+            or kwargs.get("output_hidden_states")
+        )
+        if eager:
+            return self.forward(input_features, *args, **kwargs)
+
+        key = (tuple(input_features.shape), input_features.dtype)
+        with self._lock:
+            if key not in self._graphs:
+                self._graphs[key] = self._capture(input_features)
+            graph, static_input, static_output = self._graphs[key]
+            static_input.copy_(input_features)
+            graph.replay()
+            # The static output is overwritten by the next replay
+            last_hidden_state = static_output.clone()
+
+        if kwargs.get("return_dict") is False:
+            return (last_hidden_state,)
+        return BaseModelOutput(last_hidden_state=last_hidden_state)
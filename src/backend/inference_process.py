@@ -0,0 +1,96 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.connection import Client, Connection, Listener
+
+logger = logging.getLogger("voicebot")
+
+CONNECT_TIMEOUT_S = 30
+
+
+class InferenceClient:
+    """
+    Send transcription batches to the process that owns the ASR model.
+
+    Used by the HTTP workers when ASR_INFERENCE_ADDRESS is set, so the model is loaded once per host
+    instead of once per uvicorn worker.
+    """
+
+    def __init__(self, address: str, authkey: bytes):
+        self.address = address
+        self.authkey = authkey
+        self._conn: Connection | None = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> Connection:
+        deadline = time.monotonic() + CONNECT_TIMEOUT_S
+        while True:
+            try:
+                return Client(self.address, authkey=self.authkey)
+            except (FileNotFoundError, ConnectionRefusedError):
+                # The inference process may still be starting up
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.1)
+
+    def __call__(self, inputs: list) -> list[dict]:
+        with self._lock:
+            try:
+                if self._conn is None:
+                    self._conn = self._connect()
+                self._conn.send(inputs)
+                status, payload = self._conn.recv()
+            except (EOFError, OSError) as e:
+                self._conn = None
+                raise RuntimeError("Inference process unavailable") from e
+        if status != "ok":
+            raise RuntimeError(payload)
+        return payload
+
+
+def handle_connection(conn: Connection, executor: ThreadPoolExecutor) -> None:
+    """Answer batches from one HTTP worker until it disconnects."""
+    from src.backend.server_endpoints import transcribe_batch_local  # noqa: PLC0415
+
+    with conn:
+        while True:
+            try:
+                inputs = conn.recv()
+            except EOFError:
+                return
+            try:
+                # One batch on the model at a time, always on the same thread
+                reply = ("ok", executor.submit(transcribe_batch_local, inputs).result())
+            except Exception as e:
+                logger.exception("Inference failed")
+                reply = ("error", str(e) or "Inference failed")
+            conn.send(reply)
+
+
+def serve(address: str, authkey: bytes) -> None:
+    """Load the ASR model once and serve transcription batches on address (a Unix socket path)."""
+    # Connections carry pickles, an empty key would let anyone with access to the socket run code
+    if not authkey:
+        raise ValueError("ASR_INFERENCE_AUTHKEY must not be empty")
+    from src.backend.server_endpoints import get_asr_pipeline, inference_executor  # noqa: PLC0415
+
+    with Listener(address, authkey=authkey) as listener:
+        try:
+            inference_executor.submit(get_asr_pipeline).result()
+        except RuntimeError:
+            logger.warning("ASR preload failed, retrying on first batch")
+        logger.info("Inference process listening on %s", address)
+        while True:
+            try:
+                conn = listener.accept()
+            except Exception:
+                logger.warning("Rejected inference connection")
+                continue
+            threading.Thread(target=handle_connection, args=(conn, inference_executor), daemon=True).start()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    serve(os.environ["ASR_INFERENCE_ADDRESS"], os.getenv("ASR_INFERENCE_AUTHKEY", "").encode())
@@ -1,10 +1,16 @@
 import logging
+import multiprocessing
+import os
+import secrets
+import tempfile
 
 import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 
-from src.backend.server_endpoints import register_chatbot_routes
+from src.backend.inference_process import serve
+from src.backend.server_endpoints import register_chatbot_routes, reject_oversize_requests
 
 
 def create_app() -> FastAPI:
@@ -16,6 +22,9 @@ def create_app() -> FastAPI:
         openapi_tags=[],
     )
 
+    # Innermost, so the early 413 still gets the CORS headers
+    app.middleware("http")(reject_oversize_requests)
+
     # Add CORS middleware to allow requests from the website
     app.add_middleware(
         CORSMiddleware,
@@ -24,18 +33,41 @@ def create_app() -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    app.add_middleware(GZipMiddleware, minimum_size=512)
     register_chatbot_routes(app)
     return app
 
 
+def start_inference_process() -> None:
+    """Start the process that owns the ASR model and point the uvicorn workers at it."""
+    address = os.path.join(tempfile.mkdtemp(prefix="voicebot-"), "asr.sock")
+    authkey = secrets.token_hex(16)
+    process = multiprocessing.get_context("spawn").Process(
+        target=serve,
+        args=(address, authkey.encode()),
+        name="asr-inference",
+        daemon=True,
+    )
+    process.start()
+    # Workers are spawned after this and inherit the environment
+    os.environ["ASR_INFERENCE_ADDRESS"] = address
+    os.environ["ASR_INFERENCE_AUTHKEY"] = authkey
+
+
 def main() -> None:
     logging.basicConfig(level=logging.INFO)
 
-    app = create_app()
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    if workers > 1 and not os.getenv("ASR_INFERENCE_ADDRESS"):
+        start_inference_process()
 
+    # An import string is required for uvicorn to spawn more than one worker
     uvicorn.run(
-        app,
-        workers=1,
+        "src.backend.main:create_app",
+        factory=True,
+        host=os.getenv("HOST", "127.0.0.1"),
+        port=int(os.getenv("PORT", "8000")),
+        workers=workers,
     )
 
 
@@ -1,24 +1,63 @@
+import asyncio
+import contextlib
+import functools
+import hashlib
 import json
 import logging
 import os
 import re
+import shutil
+import string
 import tempfile
 import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Annotated
 
+import numpy as np
 import torch
-from fastapi import FastAPI, File, HTTPException, UploadFile
+from fastapi import FastAPI, File, HTTPException, Request, UploadFile
+from fastapi.responses import JSONResponse
 from pydub import AudioSegment
+from starlette.concurrency import run_in_threadpool
 from transformers import pipeline
 
+from src.backend.batching import MicroBatcher
+from src.backend.cuda_graphs import CUDAGraphEncoder
+from src.backend.inference_process import InferenceClient
 from src.backend.server_schemas import KeywordsResponse, TranscribeResponse
 
+try:
+    import ahocorasick
+except ImportError:  # optional dependency, detect_keywords falls back to the regex matcher
+    ahocorasick = None
+
 MODEL_NAME = os.getenv("ASR_MODEL", "bofenghuang/whisper-medium-cv11-german")
+ASR_BACKEND = os.getenv("ASR_BACKEND", "transformers").lower()
+CT2_MODEL_NAME = os.getenv("ASR_CT2_MODEL", "")
 MAX_FILE_SIZE_MB = int(os.getenv("MAX_FILE_SIZE_MB", "25"))
 ALLOWED_EXT = {".wav", ".mp3"}
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+MULTIPART_OVERHEAD_BYTES = 16 * 1024  # boundaries and part headers on top of the file itself
+GENERIC_CONTENT_TYPE = "application/octet-stream"
+MAX_WAIT_MS = float(os.getenv("ASR_MAX_WAIT_MS", "20"))
+CHUNK_LENGTH_S = 30
+STRIDE_LENGTH_S = 5
+MAX_NEW_TOKENS = int(os.getenv("ASR_MAX_NEW_TOKENS", "225"))
+# Greedy decoding: beam search multiplies the decoder steps for little gain on short utterances
+GENERATE_KWARGS = {"num_beams": 1, "do_sample": False}
+ASR_PRELOAD = os.getenv("ASR_PRELOAD", "1") == "1"
+TRANSCRIPT_CACHE_SIZE = int(os.getenv("ASR_CACHE_SIZE", "256"))
+INFERENCE_ADDRESS = os.getenv("ASR_INFERENCE_ADDRESS")
+INFERENCE_AUTHKEY = os.getenv("ASR_INFERENCE_AUTHKEY", "").encode()
 KEYWORDS_PATH = Path("keywords.json")
 PIPELINE_TASK = "automatic-speech-recognition"
+ASR_PRECISION = os.getenv("ASR_PRECISION", "").lower()
+ASR_PRECISIONS = {"fp32", "fp16", "int8"}
+SAMPLE_RATE = 16000
+FFMPEG_BINARY = shutil.which("ffmpeg")
 
 # Logging
 logger = logging.getLogger("voicebot")
@@ -27,17 +66,58 @@ logging.basicConfig(
 )
 
 device = torch.device("cuda:0" if torch.cuda.is_available() else "cpu")
+ASR_COMPILE = os.getenv("ASR_COMPILE", "1" if device.type == "cuda" else "0") == "1"
+ASR_CUDA_GRAPHS = os.getenv("ASR_CUDA_GRAPHS", "0") == "1"
+# 30 s chunks run through the model this many at a time, on CPU batching only adds padding work
+CHUNK_BATCH_SIZE = int(os.getenv("ASR_BATCH_SIZE", "8" if device.type == "cuda" else "1"))
+# Requests are only worth collecting when their chunks run through the model together,
+# otherwise the fastest request in a batch waits for all the others to run one after another
+MAX_BATCH_SIZE = int(os.getenv("ASR_MAX_BATCH_SIZE", "8" if CHUNK_BATCH_SIZE > 1 else "1"))
+# Characters that continue a word for keyword boundaries (German alphabet, digits, underscore)
+WORD_CHARS = frozenset(string.ascii_letters + string.digits + "_äöüÄÖÜß")
+WORD_CHAR_CLASS = "[" + "".join(sorted(WORD_CHARS)) + "]"
+
 keyword_set: set[str] = set()
-word_pattern = re.compile(r"\b[\wäöüÄÖÜß]+\b", re.UNICODE)
+transcript_cache: OrderedDict[str, str] = OrderedDict()  # sha256 of upload -> transcript, LRU order
+keyword_pattern: re.Pattern[str] | None = None
+keyword_automaton = None
+
+
+def compile_keyword_pattern(keywords: set[str]) -> re.Pattern[str] | None:
+    """Compile the lowercased keywords into a single word-bounded alternation, longest first."""
+    if not keywords:
+        return None
+    alternation = "|".join(re.escape(k) for k in sorted(keywords, key=len, reverse=True))
+    return re.compile(rf"(?<!{WORD_CHAR_CLASS})(?:{alternation})(?!{WORD_CHAR_CLASS})")
+
+
+def build_keyword_automaton(keywords: set[str]):
+    """Build an Aho-Corasick automaton over the keywords, or None if pyahocorasick is unavailable."""
+    if ahocorasick is None or not keywords:
+        return None
+    automaton = ahocorasick.Automaton()
+    for keyword in keywords:
+        automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    return automaton
+
+
+def is_whole_word(text: str, start: int, end: int) -> bool:
+    """Check that text[start:end] is not part of a longer word."""
+    before = text[start - 1] if start > 0 else " "
+    after = text[end] if end < len(text) else " "
+    return before not in WORD_CHARS and after not in WORD_CHARS
 
 
 def load_keywords() -> set[str]:
     """Load keywords from JSON file"""
-    global keyword_set  # noqa: PLW0603
+    global keyword_set, keyword_pattern, keyword_automaton  # noqa: PLW0603
     try:
         with open(KEYWORDS_PATH, encoding="utf-8") as f:
             keywords_raw = json.load(f).get("keywords", [])
         keyword_set = {k.lower() for k in keywords_raw}  # lowercased and unique
+        keyword_pattern = compile_keyword_pattern(keyword_set)
+        keyword_automaton = build_keyword_automaton(keyword_set)
         logger.info("Loaded %d keywords", len(keyword_set))
         return keyword_set
     except Exception:
@@ -45,18 +125,160 @@ def load_keywords() -> set[str]:
         return set()
 
 
+def resolve_precision() -> str:
+    """Return the model precision from ASR_PRECISION, defaulting to fp16 on CUDA and int8 on CPU."""
+    if not ASR_PRECISION:
+        return "fp16" if device.type == "cuda" else "int8"
+    if ASR_PRECISION not in ASR_PRECISIONS:
+        raise ValueError(f"Unsupported ASR_PRECISION '{ASR_PRECISION}'")
+    if ASR_PRECISION == "fp16" and device.type != "cuda":
+        logger.warning("fp16 requires CUDA, falling back to fp32")
+        return "fp32"
+    if ASR_PRECISION == "int8" and device.type == "cuda":
+        logger.warning("Dynamic int8 quantization is CPU only, falling back to fp32")
+        return "fp32"
+    return ASR_PRECISION
+
+
+class CTranslate2Pipeline:
+    """Wrap a faster-whisper model so it can be called like the transformers ASR pipeline."""
+
+    def __init__(self, model):
+        self.model = model
+
+    def __call__(self, inputs, **_kwargs) -> dict | list[dict]:
+        if isinstance(inputs, list):
+            return [self(item) for item in inputs]
+        if isinstance(inputs, dict):
+            inputs = inputs.get("raw", inputs.get("array"))
+        segments, _info = self.model.transcribe(
+            inputs,
+            language="de",
+            beam_size=GENERATE_KWARGS["num_beams"],
+            without_timestamps=True,
+            max_new_tokens=MAX_NEW_TOKENS,
+        )
+        return {"text": " ".join(seg.text.strip() for seg in segments)}
+
+
+def resolve_compute_type() -> str:
+    """Map ASR_PRECISION to a CTranslate2 compute type, defaulting to int8."""
+    precision = ASR_PRECISION or "int8"
+    if precision not in ASR_PRECISIONS:
+        raise ValueError(f"Unsupported ASR_PRECISION '{precision}'")
+    if precision == "int8":
+        return "int8_float16" if device.type == "cuda" else "int8"
+    if precision == "fp16" and device.type != "cuda":
+        logger.warning("fp16 requires CUDA, falling back to fp32")
+        return "float32"
+    return {"fp32": "float32", "fp16": "float16"}[precision]
+
+
+def load_ctranslate2_pipeline() -> CTranslate2Pipeline:
+    """Load the faster-whisper (CTranslate2) backend."""
+    from faster_whisper import WhisperModel  # noqa: PLC0415 - optional dependency
+
+    # ASR_MODEL is a transformers checkpoint, CTranslate2 needs a converted model (model.bin)
+    if not CT2_MODEL_NAME:
+        raise ValueError("ASR_BACKEND=ctranslate2 requires ASR_CT2_MODEL, a CTranslate2-converted Whisper model")
+    compute_type = resolve_compute_type()
+    logger.info("Loading CTranslate2 model '%s' on %s (%s)", CT2_MODEL_NAME, device, compute_type)
+    model = WhisperModel(
+        CT2_MODEL_NAME,
+        device=device.type,
+        device_index=device.index or 0,
+        compute_type=compute_type,
+    )
+    return CTranslate2Pipeline(model)
+
+
+def pin_feature_extractor(feature_extractor, target: torch.device) -> None:
+    """Compute Whisper log-mel features on target with the window and mel filterbank cached there."""
+    window = torch.hann_window(feature_extractor.n_fft, device=target)
+    mel_filters = torch.as_tensor(feature_extractor.mel_filters, dtype=torch.float32, device=target)
+
+    # Same math as WhisperFeatureExtractor._torch_extract_fbank_features, minus the per-call setup
+    def extract_fbank_features(waveform: np.ndarray, _device: str = "cpu") -> np.ndarray:
+        waveform = torch.as_tensor(waveform, dtype=torch.float32, device=target)
+        stft = torch.stft(
+            waveform, feature_extractor.n_fft, feature_extractor.hop_length, window=window, return_complex=True
+        )
+        magnitudes = stft[..., :-1].abs() ** 2
+        log_spec = torch.clamp(mel_filters.T @ magnitudes, min=1e-10).log10()
+        max_val = log_spec.amax(dim=(1, 2), keepdim=True) if waveform.dim() == 2 else log_spec.max()  # noqa: PLR2004
+        log_spec = torch.maximum(log_spec, max_val - 8.0)
+        return ((log_spec + 4.0) / 4.0).cpu().numpy()
+
+    feature_extractor._torch_extract_fbank_features = extract_fbank_features
+
+
+def load_transformers_pipeline():
+    """Load the transformers ASR pipeline."""
+    precision = resolve_precision()
+    logger.info("Loading ASR model '%s' on %s (%s)", MODEL_NAME, device, precision)
+    torch_dtype = torch.float16 if precision == "fp16" else None
+    asr_pipe = pipeline(
+        PIPELINE_TASK,
+        model=MODEL_NAME,
+        device=device,
+        torch_dtype=torch_dtype,
+        model_kwargs={"attn_implementation": "sdpa"},
+    )
+    if precision == "int8":
+        asr_pipe.model = torch.ao.quantization.quantize_dynamic(
+            asr_pipe.model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+    try:
+        forced = asr_pipe.tokenizer.get_decoder_prompt_ids(
+            language="de", task="transcribe"
+        )
+        asr_pipe.model.config.forced_decoder_ids = forced
+    except Exception:
+        logger.warning("Forced decoder ids not set")
+    generation_config = asr_pipe.model.generation_config
+    generation_config.num_beams = GENERATE_KWARGS["num_beams"]
+    generation_config.do_sample = GENERATE_KWARGS["do_sample"]
+    generation_config.return_timestamps = False
+    generation_config.max_new_tokens = MAX_NEW_TOKENS
+    if device.type == "cuda":
+        pin_feature_extractor(asr_pipe.feature_extractor, device)
+    # Only the encoder: its input is always 30 s of mel frames, the decoder shapes change every step
+    encoder = asr_pipe.model.get_encoder()
+    if ASR_COMPILE:
+        encoder.forward = torch.compile(encoder.forward, mode="reduce-overhead", fullgraph=False)
+        if ASR_CUDA_GRAPHS:
+            logger.warning("ASR_CUDA_GRAPHS ignored, ASR_COMPILE already replays CUDA graphs")
+    elif ASR_CUDA_GRAPHS and device.type == "cuda":
+        # reduce-overhead compilation already replays CUDA graphs, this covers the eager encoder
+        encoder.forward = CUDAGraphEncoder(encoder.forward)
+    elif ASR_CUDA_GRAPHS:
+        logger.warning("ASR_CUDA_GRAPHS ignored, CUDA graphs require CUDA")
+    return asr_pipe
+
+
+def warm_up(asr_pipe) -> None:
+    """Run silence through the pipeline so lazy allocations, compilation and graph capture happen at load time."""
+    silence = np.zeros(SAMPLE_RATE, dtype=np.float32)
+    asr_pipe({"raw": silence, "sampling_rate": SAMPLE_RATE})
+    if CHUNK_BATCH_SIZE > 1:
+        # A full chunk batch is another encoder shape, and with it another compiled graph
+        asr_pipe(
+            [{"raw": silence, "sampling_rate": SAMPLE_RATE} for _ in range(CHUNK_BATCH_SIZE)],
+            batch_size=CHUNK_BATCH_SIZE,
+        )
+
+
+@functools.cache
 def get_asr_pipeline():
-    """Load and return the ASR pipeline."""
+    """Load and return the ASR pipeline for ASR_BACKEND (loaded once per process)."""
     try:
-        logger.info("Loading ASR model '%s' on %s", MODEL_NAME, device)
-        asr_pipe = pipeline(PIPELINE_TASK, model=MODEL_NAME, device=device)
-        try:
-            forced = asr_pipe.tokenizer.get_decoder_prompt_ids(
-                language="de", task="transcribe"
-            )
-            asr_pipe.model.config.forced_decoder_ids = forced
-        except Exception:
-            logger.warning("Forced decoder ids not set")
+        if ASR_BACKEND == "ctranslate2":
+            asr_pipe = load_ctranslate2_pipeline()
+        elif ASR_BACKEND == "transformers":
+            asr_pipe = load_transformers_pipeline()
+        else:
+            raise ValueError(f"Unsupported ASR_BACKEND '{ASR_BACKEND}'")
+        warm_up(asr_pipe)
         logger.info("ASR model ready")
         return asr_pipe
     except Exception:
@@ -64,19 +286,101 @@ def get_asr_pipeline():
         raise RuntimeError("Model initialization failed")
 
 
-def detect_keywords(text: str) -> list[str]:
-    """Detect keywords in the transcribed text."""
-    found: list[str] = []
-    for token in word_pattern.findall(text.lower()):
-        if token in keyword_set and token not in found:
-            found.append(token)
+def transcribe_batch_local(inputs: list) -> list[dict]:
+    """Transcribe a batch of audio inputs in one pipeline call on the model in this process."""
+    pipe = get_asr_pipeline()
+    return pipe(
+        inputs,
+        batch_size=CHUNK_BATCH_SIZE,
+        chunk_length_s=CHUNK_LENGTH_S,
+        stride_length_s=STRIDE_LENGTH_S,
+        return_timestamps=False,
+        generate_kwargs=GENERATE_KWARGS,
+    )
+
+
+# With several uvicorn workers the model lives in one inference process instead of once per worker
+inference_client = InferenceClient(INFERENCE_ADDRESS, INFERENCE_AUTHKEY) if INFERENCE_ADDRESS else None
+
+
+def transcribe_batch(inputs: list) -> list[dict]:
+    """Transcribe a batch of audio inputs, in the inference process if one is configured."""
+    if inference_client is not None:
+        return inference_client(inputs)
+    return transcribe_batch_local(inputs)
+
+
+# Loading, warm-up and every batch run on this one thread: inductor keeps its CUDA graphs per thread,
+# graphs recorded on another thread are never replayed
+inference_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="asr-inference")
+asr_batcher = MicroBatcher(
+    transcribe_batch, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS, executor=inference_executor
+)
+
+
+def pydub_to_pcm16k(path: str) -> np.ndarray:
+    """Decode an audio file to mono 16 kHz float32 PCM with pydub (fallback when ffmpeg is not on PATH)."""
+    audio = AudioSegment.from_file(path).set_channels(1).set_frame_rate(SAMPLE_RATE).set_sample_width(2)
+    return np.frombuffer(audio.raw_data, np.int16).astype(np.float32) / 32768.0
+
+
+def automaton_keywords(lowered: str) -> set[str]:
+    """Match keywords with the automaton, keeping the leftmost-longest whole-word hits like the regex does."""
+    hits = sorted(
+        (end - len(keyword) + 1, -len(keyword), keyword)
+        for end, keyword in keyword_automaton.iter(lowered)
+        if is_whole_word(lowered, end - len(keyword) + 1, end + 1)
+    )
+    found = set()
+    covered = 0
+    for start, negative_length, keyword in hits:
+        # A hit inside (or overlapping) an already taken longer one is dropped, e.g. "bad" in "bad homburg"
+        if start >= covered:
+            found.add(keyword)
+            covered = start - negative_length
     return found
 
 
+def detect_keywords(text: str) -> list[str]:
+    """Detect keywords in the transcribed text, returned sorted and without duplicates."""
+    lowered = text.lower()
+    if keyword_automaton is not None:
+        found = automaton_keywords(lowered)
+    elif keyword_pattern is not None:
+        found = set(keyword_pattern.findall(lowered))
+    else:
+        return []
+    return sorted(found)
+
+
+def get_cached_transcript(digest: str) -> str | None:
+    """Return the cached transcript for an upload digest, marking it as recently used."""
+    text = transcript_cache.get(digest)
+    if text is not None:
+        transcript_cache.move_to_end(digest)
+    return text
+
+
+def cache_transcript(digest: str, text: str) -> None:
+    """Cache a transcript, evicting the least recently used entry when full."""
+    if TRANSCRIPT_CACHE_SIZE <= 0:
+        return
+    transcript_cache[digest] = text
+    transcript_cache.move_to_end(digest)
+    while len(transcript_cache) > TRANSCRIPT_CACHE_SIZE:
+        transcript_cache.popitem(last=False)
+
+
 def validate_file_meta(upload: UploadFile) -> None:
     ext = os.path.splitext(upload.filename or "")[1].lower()
     if ext not in ALLOWED_EXT:
         raise HTTPException(status_code=400, detail="Unsupported file extension")
+    # Clients that do not know the type send the generic one
+    content_type = upload.content_type or GENERIC_CONTENT_TYPE
+    if not content_type.startswith("audio/") and content_type != GENERIC_CONTENT_TYPE:
+        raise HTTPException(status_code=400, detail="Unsupported content type")
+    if upload.size is not None:
+        ensure_size_limit(upload.size)
 
 
 def ensure_size_limit(size_bytes: int) -> None:
@@ -84,19 +388,122 @@ def ensure_size_limit(size_bytes: int) -> None:
         raise HTTPException(status_code=413, detail="File too large")
 
 
+async def reject_oversize_requests(request: Request, call_next):
+    """Reject /transcribe requests whose Content-Length is over the limit before the body is read."""
+    content_length = request.headers.get("content-length", "")
+    max_bytes = MAX_FILE_SIZE_MB * 1024 * 1024 + MULTIPART_OVERHEAD_BYTES
+    if request.url.path == "/transcribe" and content_length.isdigit() and int(content_length) > max_bytes:
+        return JSONResponse(status_code=413, content={"detail": "File too large"})
+    return await call_next(request)
+
+
+async def iter_upload(upload: UploadFile, digest) -> AsyncIterator[bytes]:
+    """Yield the upload in chunks, enforcing the size limit and feeding each chunk to digest."""
+    total = 0
+    while chunk := await upload.read(UPLOAD_CHUNK_SIZE):
+        total += len(chunk)
+        ensure_size_limit(total)
+        digest.update(chunk)
+        yield chunk
+
+
+async def save_upload(upload: UploadFile, path: str) -> str:
+    """Stream the upload to path chunk by chunk and return its sha256."""
+    digest = hashlib.sha256()
+    with open(path, "wb") as f:
+        async for chunk in iter_upload(upload, digest):
+            await run_in_threadpool(f.write, chunk)
+    return digest.hexdigest()
+
+
+async def kill_ffmpeg(proc: asyncio.subprocess.Process, pcm: asyncio.Task) -> None:
+    """Kill ffmpeg and reap it along with its stdout reader."""
+    with contextlib.suppress(ProcessLookupError):
+        proc.kill()
+    await proc.wait()
+    await asyncio.gather(pcm, return_exceptions=True)
+
+
+async def decode_upload_to_pcm16k(upload: UploadFile) -> tuple[np.ndarray, str]:
+    """Pipe the upload into ffmpeg's stdin and return mono 16 kHz float32 PCM and the upload's sha256."""
+    proc = await asyncio.create_subprocess_exec(
+        FFMPEG_BINARY or "ffmpeg",
+        "-nostdin",
+        "-threads", "1",
+        "-i", "pipe:0",
+        "-f", "s16le",
+        "-ac", "1",
+        "-ar", str(SAMPLE_RATE),
+        "pipe:1",
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL,
+    )
+    # Read stdout concurrently, otherwise ffmpeg blocks on a full pipe while we are still writing
+    pcm = asyncio.create_task(proc.stdout.read())
+    digest = hashlib.sha256()
+    try:
+        async for chunk in iter_upload(upload, digest):
+            proc.stdin.write(chunk)
+            await proc.stdin.drain()
+        proc.stdin.close()
+        out = await pcm
+    except (BrokenPipeError, ConnectionResetError) as e:  # ffmpeg exited before reading everything
+        await kill_ffmpeg(proc, pcm)
+        raise RuntimeError("Audio decoding failed") from e
+    except BaseException:
+        await kill_ffmpeg(proc, pcm)
+        raise
+    if await proc.wait() != 0:
+        raise RuntimeError("Audio decoding failed")
+    return np.frombuffer(out, np.int16).astype(np.float32) / 32768.0, digest.hexdigest()
+
+
+async def decode_upload_with_pydub(upload: UploadFile) -> tuple[np.ndarray, str]:
+    """Save the upload to a temp file for pydub and return mono 16 kHz float32 PCM and the upload's sha256."""
+    ext = os.path.splitext(upload.filename or "")[1].lower()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, f"upload{ext}")
+        digest = await save_upload(upload, path)
+        audio = await run_in_threadpool(pydub_to_pcm16k, path)
+    return audio, digest
+
+
+async def transcribe_cached(digest: str, asr_input) -> tuple[str, float]:
+    """Return the transcript and ASR seconds, reusing the cached transcript of a known upload."""
+    text = get_cached_transcript(digest)
+    if text is not None:
+        return text, 0.0
+    # Batched with concurrent requests and run off the event loop
+    asr_start = time.time()
+    result = await asr_batcher.submit(asr_input)
+    text = result.get("text", "").strip()
+    cache_transcript(digest, text)
+    return text, time.time() - asr_start
+
+
 def register_chatbot_routes(app: FastAPI):
     """Register endpoints for voicebot."""
 
     @app.on_event("startup")
     def startup_event():
         load_keywords()
+        if ASR_PRELOAD and inference_client is None:
+            try:
+                inference_executor.submit(get_asr_pipeline).result()
+            except RuntimeError:
+                logger.warning("ASR preload failed, retrying on first request")
+
+    @app.on_event("shutdown")
+    async def shutdown_event():
+        await asr_batcher.stop()
 
     @app.get("/keywords", response_model=KeywordsResponse)
     def list_keywords():
         return KeywordsResponse(keywords=sorted(load_keywords()))
 
     @app.post("/transcribe", response_model=TranscribeResponse)
-    async def transcribe(audio_file: Annotated[UploadFile, File(...)]):  # noqa: PLR0914
+    async def transcribe(audio_file: Annotated[UploadFile, File(...)]):
         if not audio_file.filename:
             raise HTTPException(status_code=400, detail="Empty filename")
 
@@ -104,32 +511,21 @@ def register_chatbot_routes(app: FastAPI):
 
         start = time.time()
         try:
-            contents = await audio_file.read()
-            ensure_size_limit(len(contents))
-
-            with tempfile.TemporaryDirectory() as tmpdir:
-                raw_path = os.path.join(tmpdir, audio_file.filename)
-                with open(raw_path, "wb") as f:
-                    f.write(contents)
-
-                # Convert to WAV
-                conv_start = time.time()
-                audio = AudioSegment.from_file(raw_path)
-                wav_path = os.path.join(tmpdir, "audio.wav")
-                audio.export(wav_path, format="wav")
-                conv_time = time.time() - conv_start
-
-                # Transcribe
-                asr_start = time.time()
-                pipe = get_asr_pipeline()
-                result = pipe(wav_path)
-                text = result.get("text", "").strip()
-                asr_time = time.time() - asr_start
-
-                # Detect keywords
-                kw_start = time.time()
-                detected = detect_keywords(text)
-                kw_time = time.time() - kw_start
+            # Decode to 16 kHz mono PCM, streaming the upload straight into ffmpeg when available
+            conv_start = time.time()
+            if FFMPEG_BINARY:
+                audio, digest = await decode_upload_to_pcm16k(audio_file)
+            else:
+                audio, digest = await decode_upload_with_pydub(audio_file)
+            conv_time = time.time() - conv_start
+
+            # The pipeline takes the samples directly, no WAV file in between
+            text, asr_time = await transcribe_cached(digest, {"raw": audio, "sampling_rate": SAMPLE_RATE})
+
+            # Detect keywords
+            kw_start = time.time()
+            detected = detect_keywords(text)
+            kw_time = time.time() - kw_start
 
             total = time.time() - start
             return TranscribeResponse(
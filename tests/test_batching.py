@@ -0,0 +1,102 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src.backend.batching import MicroBatcher
+
+
+def test_concurrent_submits_share_one_batch():
+    calls = []
+
+    def process_batch(items):
+        calls.append(list(items))
+        return [item * 2 for item in items]
+
+    async def run():
+        batcher = MicroBatcher(process_batch, max_batch_size=4, max_wait_ms=50)
+        try:
+            return await asyncio.gather(*(batcher.submit(i) for i in range(3)))
+        finally:
+            await batcher.stop()
+
+    assert asyncio.run(run()) == [0, 2, 4]
+    assert calls == [[0, 1, 2]]
+
+
+def test_batch_size_is_capped():
+    calls = []
+
+    def process_batch(items):
+        calls.append(len(items))
+        return items
+
+    async def run():
+        batcher = MicroBatcher(process_batch, max_batch_size=2, max_wait_ms=50)
+        try:
+            return await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+        finally:
+            await batcher.stop()
+
+    assert asyncio.run(run()) == [0, 1, 2, 3, 4]
+    assert calls == [2, 2, 1]
+
+
+def test_batch_errors_propagate_to_every_caller():
+    def process_batch(_items):
+        raise RuntimeError("Model initialization failed")
+
+    async def run():
+        batcher = MicroBatcher(process_batch, max_batch_size=4, max_wait_ms=10)
+        try:
+            return await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+        finally:
+            await batcher.stop()
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+def test_wrong_result_count_fails_callers_and_keeps_worker():
+    def process_batch(items):
+        return items[:-1] if len(items) > 1 else items
+
+    async def run():
+        batcher = MicroBatcher(process_batch, max_batch_size=4, max_wait_ms=10)
+        try:
+            results = await asyncio.wait_for(
+                asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True), timeout=1
+            )
+            return results, await asyncio.wait_for(batcher.submit("next"), timeout=1)
+        finally:
+            await batcher.stop()
+
+    results, after = asyncio.run(run())
+    assert all(isinstance(r, ValueError) for r in results)
+    assert after == "next"
+
+
+def test_batches_run_on_the_given_executor():
+    executor = ThreadPoolExecutor(max_workers=1)
+    thread = executor.submit(threading.get_ident).result()
+
+    def process_batch(items):
+        return [threading.get_ident() for _ in items]
+
+    async def run():
+        batcher = MicroBatcher(process_batch, max_batch_size=1, max_wait_ms=1, executor=executor)
+        try:
+            return await asyncio.gather(*(batcher.submit(i) for i in range(3)))
+        finally:
+            await batcher.stop()
+
+    try:
+        assert asyncio.run(run()) == [thread] * 3
+    finally:
+        executor.shutdown()
+
+
+def test_submit_restarts_on_new_event_loop():
+    batcher = MicroBatcher(lambda items: items, max_wait_ms=1)
+
+    assert asyncio.run(batcher.submit("a")) == "a"
+    assert asyncio.run(batcher.submit("b")) == "b"
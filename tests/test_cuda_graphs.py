@@ -0,0 +1,47 @@
+import pytest
+import torch
+from transformers import WhisperConfig
+from transformers.models.whisper.modeling_whisper import WhisperEncoder
+
+from src.backend.cuda_graphs import CUDAGraphEncoder
+
+NUM_MEL_BINS = 80
+NUM_FRAMES = 3000
+
+
+def tiny_encoder() -> WhisperEncoder:
+    config = WhisperConfig(
+        d_model=64,
+        encoder_layers=2,
+        encoder_attention_heads=4,
+        encoder_ffn_dim=128,
+        num_mel_bins=NUM_MEL_BINS,
+        max_source_positions=NUM_FRAMES // 2,
+    )
+    return WhisperEncoder(config).eval()
+
+
+def test_cpu_input_runs_eagerly():
+    encoder = tiny_encoder()
+    graphed = CUDAGraphEncoder(encoder.forward)
+    features = torch.randn(1, NUM_MEL_BINS, NUM_FRAMES)
+
+    with torch.no_grad():
+        expected = encoder(features).last_hidden_state
+        actual = graphed(features).last_hidden_state
+
+    torch.testing.assert_close(actual, expected)
+    assert not graphed._graphs
+
+
+@pytest.mark.skipif(not torch.cuda.is_available(), reason="CUDA graphs need a GPU")
+def test_replay_matches_eager_per_batch_size():
+    encoder = tiny_encoder().cuda()
+    graphed = CUDAGraphEncoder(encoder.forward)
+
+    with torch.no_grad():
+        for batch_size in (1, 2, 1):
+            features = torch.randn(batch_size, NUM_MEL_BINS, NUM_FRAMES, device="cuda")
+            torch.testing.assert_close(graphed(features).last_hidden_state, encoder(features).last_hidden_state)
+
+    assert len(graphed._graphs) == 2  # noqa: PLR2004
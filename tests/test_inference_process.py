@@ -0,0 +1,42 @@
+import threading
+
+import pytest
+
+from src.backend import inference_process, server_endpoints
+from src.backend.inference_process import InferenceClient
+
+AUTHKEY = b"test-authkey"
+
+
+def start_inference_process(tmp_path) -> str:
+    """Run the inference server in a daemon thread, after get_asr_pipeline has been mocked."""
+    address = str(tmp_path / "asr.sock")
+    threading.Thread(target=inference_process.serve, args=(address, AUTHKEY), daemon=True).start()
+    return address
+
+
+def test_client_round_trip(tmp_path, monkeypatch):
+    def mock_pipe(inputs, **_kwargs):
+        return [{"text": f"batch of {len(inputs)}"} for _ in inputs]
+
+    monkeypatch.setattr(server_endpoints, "get_asr_pipeline", lambda: mock_pipe)
+    client = InferenceClient(start_inference_process(tmp_path), AUTHKEY)
+
+    assert client(["a", "b"]) == [{"text": "batch of 2"}, {"text": "batch of 2"}]
+    assert client(["c"]) == [{"text": "batch of 1"}]
+
+
+def test_client_raises_inference_errors(tmp_path, monkeypatch):
+    def fail_get_asr_pipeline():
+        raise RuntimeError("Model initialization failed")
+
+    monkeypatch.setattr(server_endpoints, "get_asr_pipeline", fail_get_asr_pipeline)
+    client = InferenceClient(start_inference_process(tmp_path), AUTHKEY)
+
+    with pytest.raises(RuntimeError, match="Model initialization failed"):
+        client(["a"])
+
+
+def test_serve_refuses_empty_authkey(tmp_path):
+    with pytest.raises(ValueError, match="ASR_INFERENCE_AUTHKEY"):
+        inference_process.serve(str(tmp_path / "asr.sock"), b"")
@@ -1,6 +1,12 @@
+import asyncio
 import io
+import json
+import threading
+from collections import OrderedDict
 
+import numpy as np
 import pytest
+import torch
 from fastapi.testclient import TestClient
 
 from src.backend import server_endpoints
@@ -8,12 +14,35 @@ from src.backend.main import create_app
 
 STATUS_OK = 200
 STATUS_BAD_REQUEST = 400
+STATUS_CONTENT_TOO_LARGE = 413
+STATUS_INTERNAL_SERVER_ERROR = 500
 STATUS_UNPROCESSABLE_ENTITY = 422
 
 
+def fake_asr_pipeline(inputs, **_kwargs):
+    return [{"text": "Hallo Welt"} for _ in inputs]
+
+
 @pytest.fixture
-def client():
-    return TestClient(create_app())
+def client(monkeypatch):
+    # Never load the real Whisper model, tests that care about the transcript patch their own pipeline
+    monkeypatch.setattr(server_endpoints, "get_asr_pipeline", lambda: fake_asr_pipeline)
+    # Run startup/shutdown like a real server, so the batcher is stopped after each test
+    with TestClient(create_app()) as test_client:
+        yield test_client
+
+
+@pytest.fixture(autouse=True)
+def empty_transcript_cache(monkeypatch):
+    monkeypatch.setattr(server_endpoints, "transcript_cache", OrderedDict())
+
+
+def fake_ffmpeg(tmp_path, monkeypatch, script: str):
+    """Install a shell script as the ffmpeg binary."""
+    binary = tmp_path / "ffmpeg"
+    binary.write_text(f"#!/bin/sh\n{script}\n")
+    binary.chmod(0o755)
+    monkeypatch.setattr(server_endpoints, "FFMPEG_BINARY", str(binary))
 
 
 def test_transcribe_missing_file(client):
@@ -33,21 +62,62 @@ def test_transcribe_unsupported_format(client):
     assert response.json()["detail"] == "Unsupported file extension"
 
 
-def test_transcribe_valid_audio_mocked(client, monkeypatch):
-    # --- mock ASR pipeline factory ---
-    def mock_get_asr_pipeline():
-        return lambda _: {"text": "Hallo Welt"}
+def test_transcribe_unsupported_content_type(client):
+    response = client.post(
+        "/transcribe",
+        files={"audio_file": ("test.wav", io.BytesIO(b"fake wav data"), "text/plain")},
+    )
 
-    monkeypatch.setattr(
-        server_endpoints,
-        "get_asr_pipeline",
-        mock_get_asr_pipeline,
+    assert response.status_code == STATUS_BAD_REQUEST
+    assert response.json()["detail"] == "Unsupported content type"
+
+
+def test_transcribe_rejects_content_length_before_parsing(client, monkeypatch):
+    monkeypatch.setattr(server_endpoints, "MAX_FILE_SIZE_MB", 0)
+
+    # Not even multipart: without the Content-Length check this would be a 422
+    response = client.post("/transcribe", content=b"x" * (2 * server_endpoints.MULTIPART_OVERHEAD_BYTES))
+
+    assert response.status_code == STATUS_CONTENT_TOO_LARGE
+    assert response.json()["detail"] == "File too large"
+
+
+def test_transcribe_oversize_upload_rejected(client, monkeypatch):
+    def fail_get_asr_pipeline():
+        raise AssertionError("ASR must not run for oversize uploads")
+
+    monkeypatch.setattr(server_endpoints, "get_asr_pipeline", fail_get_asr_pipeline)
+    monkeypatch.setattr(server_endpoints, "MAX_FILE_SIZE_MB", 0)
+
+    response = client.post(
+        "/transcribe",
+        files={"audio_file": ("test.wav", io.BytesIO(b"fake wav data"), "audio/wav")},
     )
 
-    # --- mock audio decoding ---
+    assert response.status_code == STATUS_CONTENT_TOO_LARGE
+    assert response.json()["detail"] == "File too large"
+
+
+def test_transcribe_valid_audio_mocked(client, monkeypatch):
+    # --- ASR comes from the client fixture's fake pipeline ---
+
+    # --- mock audio decoding (pydub fallback) ---
+    monkeypatch.setattr(server_endpoints, "FFMPEG_BINARY", None)
+
     class MockAudio:
-        def export(self, *_args, **_kwargs):
-            pass
+        raw_data = np.zeros(server_endpoints.SAMPLE_RATE, dtype=np.int16).tobytes()
+
+        def set_channels(self, channels):
+            assert channels == 1
+            return self
+
+        def set_frame_rate(self, frame_rate):
+            assert frame_rate == server_endpoints.SAMPLE_RATE
+            return self
+
+        def set_sample_width(self, sample_width):
+            assert sample_width == 2  # noqa: PLR2004
+            return self
 
     monkeypatch.setattr(
         server_endpoints.AudioSegment,
@@ -69,3 +139,175 @@ def test_transcribe_valid_audio_mocked(client, monkeypatch):
     assert "keywords" in data
     assert "timings" in data
 
+
+def test_transcribe_streams_upload_through_ffmpeg(client, monkeypatch, tmp_path):
+    received = {}
+
+    def mock_pipe(inputs, **_kwargs):
+        received.update(inputs[0])
+        return [{"text": "Der Zug nach Berlin"}]
+
+    monkeypatch.setattr(server_endpoints, "get_asr_pipeline", lambda: mock_pipe)
+    monkeypatch.setattr(server_endpoints, "UPLOAD_CHUNK_SIZE", 1024)
+    # "Decode" by echoing stdin, so the upload bytes come back as s16le samples
+    fake_ffmpeg(tmp_path, monkeypatch, "exec cat")
+    samples = np.full(3 * server_endpoints.SAMPLE_RATE, 16384, dtype=np.int16)
+
+    response = client.post(
+        "/transcribe",
+        files={"audio_file": ("test.mp3", io.BytesIO(samples.tobytes()), "audio/mpeg")},
+    )
+
+    assert response.status_code == STATUS_OK
+    assert received["sampling_rate"] == server_endpoints.SAMPLE_RATE
+    assert received["raw"].dtype == np.float32
+    np.testing.assert_array_equal(received["raw"], np.full(samples.shape, 0.5, dtype=np.float32))
+    assert response.json()["text"] == "Der Zug nach Berlin"
+
+
+def test_transcribe_ffmpeg_failure(client, monkeypatch, tmp_path):
+    fake_ffmpeg(tmp_path, monkeypatch, "exit 1")
+
+    response = client.post(
+        "/transcribe",
+        files={"audio_file": ("test.mp3", io.BytesIO(b"not audio"), "audio/mpeg")},
+    )
+
+    assert response.status_code == STATUS_INTERNAL_SERVER_ERROR
+    assert response.json()["detail"] == "Audio decoding failed"
+
+
+def test_transcribe_repeated_upload_served_from_cache(client, monkeypatch, tmp_path):
+    calls = []
+
+    def mock_pipe(inputs, **_kwargs):
+        calls.append(len(inputs))
+        return [{"text": "Hallo Welt"} for _ in inputs]
+
+    monkeypatch.setattr(server_endpoints, "get_asr_pipeline", lambda: mock_pipe)
+    fake_ffmpeg(tmp_path, monkeypatch, "exec cat")
+
+    responses = [
+        client.post("/transcribe", files={"audio_file": ("test.wav", io.BytesIO(b"same audio samples"), "audio/wav")})
+        for _ in range(2)
+    ]
+
+    assert [r.status_code for r in responses] == [STATUS_OK, STATUS_OK]
+    assert calls == [1]
+    assert responses[1].json()["text"] == "Hallo Welt"
+    assert responses[1].json()["timings"]["asr_sec"] == 0
+
+
+def test_preload_and_batches_share_the_inference_thread(monkeypatch):
+    threads = []
+
+    def mock_pipe(inputs, **_kwargs):
+        threads.append(threading.get_ident())
+        return [{"text": "Hallo Welt"} for _ in inputs]
+
+    def mock_get_asr_pipeline():
+        threads.append(threading.get_ident())
+        return mock_pipe
+
+    monkeypatch.setattr(server_endpoints, "get_asr_pipeline", mock_get_asr_pipeline)
+    monkeypatch.setattr(server_endpoints, "ASR_PRELOAD", True)
+    audio = {"raw": np.zeros(server_endpoints.SAMPLE_RATE, dtype=np.float32), "sampling_rate": 16000}
+
+    with TestClient(create_app()):
+        result = asyncio.run(server_endpoints.asr_batcher.submit(audio))
+
+    assert result == {"text": "Hallo Welt"}
+    # preload, the batch's get_asr_pipeline() and the pipeline call
+    assert len(set(threads)) == 1
+    assert threads[0] != threading.get_ident()
+
+
+@pytest.mark.parametrize(
+    ("requested", "device_type", "expected"),
+    [
+        ("", "cpu", "int8"),
+        ("", "cuda", "fp16"),
+        ("fp32", "cuda", "fp32"),
+        ("fp16", "cpu", "fp32"),
+        ("int8", "cuda", "fp32"),
+    ],
+)
+def test_resolve_precision(monkeypatch, requested, device_type, expected):
+    monkeypatch.setattr(server_endpoints, "ASR_PRECISION", requested)
+    monkeypatch.setattr(server_endpoints, "device", torch.device(device_type))
+
+    assert server_endpoints.resolve_precision() == expected
+
+
+@pytest.mark.parametrize(
+    ("requested", "device_type", "expected"),
+    [
+        ("", "cpu", "int8"),
+        ("", "cuda", "int8_float16"),
+        ("fp16", "cuda", "float16"),
+        ("fp16", "cpu", "float32"),
+    ],
+)
+def test_resolve_compute_type(monkeypatch, requested, device_type, expected):
+    monkeypatch.setattr(server_endpoints, "ASR_PRECISION", requested)
+    monkeypatch.setattr(server_endpoints, "device", torch.device(device_type))
+
+    assert server_endpoints.resolve_compute_type() == expected
+
+
+def test_ctranslate2_pipeline_joins_segments():
+    class Segment:
+        def __init__(self, text):
+            self.text = text
+
+    class MockWhisperModel:
+        @staticmethod
+        def transcribe(audio, language, beam_size, without_timestamps, **_kwargs):
+            assert isinstance(audio, np.ndarray)
+            assert language == "de"
+            assert beam_size == 1
+            assert without_timestamps
+            return iter([Segment(" Der Zug"), Segment(" nach Berlin")]), None
+
+    pipe = server_endpoints.CTranslate2Pipeline(MockWhisperModel())
+    audio = np.zeros(server_endpoints.SAMPLE_RATE, dtype=np.float32)
+
+    assert pipe({"raw": audio, "sampling_rate": server_endpoints.SAMPLE_RATE}) == {"text": "Der Zug nach Berlin"}
+
+
+@pytest.fixture(params=["regex", "ahocorasick"])
+def german_keywords(request, tmp_path, monkeypatch):
+    if request.param == "ahocorasick":
+        pytest.importorskip("ahocorasick")
+    else:
+        monkeypatch.setattr(server_endpoints, "ahocorasick", None)
+    keywords_file = tmp_path / "keywords.json"
+    keywords = ["Zug", "Berlin", "Berlin Hbf", "Bad", "Bad Homburg"]
+    keywords_file.write_text(json.dumps({"keywords": keywords}), encoding="utf-8")
+    monkeypatch.setattr(server_endpoints, "KEYWORDS_PATH", keywords_file)
+    monkeypatch.setattr(server_endpoints, "keyword_set", set())
+    monkeypatch.setattr(server_endpoints, "keyword_pattern", None)
+    monkeypatch.setattr(server_endpoints, "keyword_automaton", None)
+    return server_endpoints.load_keywords()
+
+
+def test_detect_keywords_whole_words(german_keywords):
+    detected = server_endpoints.detect_keywords("Berlin ist zugänglich, der ZUG fährt über Bad Homburg nach Berlin Hbf")
+
+    # "bad" only occurs inside "bad homburg", so neither matcher reports it
+    assert detected == ["bad homburg", "berlin", "berlin hbf", "zug"]
+
+
+def test_pinned_feature_extractor_matches_reference():
+    from transformers import WhisperFeatureExtractor  # noqa: PLC0415
+
+    reference = WhisperFeatureExtractor(feature_size=80)
+    pinned = WhisperFeatureExtractor(feature_size=80)
+    server_endpoints.pin_feature_extractor(pinned, torch.device("cpu"))
+
+    rng = np.random.default_rng(0)
+    batch = [rng.standard_normal(n * server_endpoints.SAMPLE_RATE).astype(np.float32) for n in (3, 5)]
+    expected = reference(batch, sampling_rate=server_endpoints.SAMPLE_RATE, return_tensors="np").input_features
+    actual = pinned(batch, sampling_rate=server_endpoints.SAMPLE_RATE, return_tensors="np").input_features
+
+    np.testing.assert_allclose(actual, expected, atol=1e-5)